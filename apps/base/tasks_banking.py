@@ -131,16 +131,20 @@ def check_wisetransfer_ids(profile_id):
     if profile_id is None:
         profile_id = wise_business_profile()
 
+    # Use the same interval for every account, formatted once up front
+    interval_end = datetime.utcnow()
+    interval_start = interval_end - timedelta(days=120)
+    interval_start_iso = interval_start.isoformat() + "Z"
+    interval_end_iso = interval_end.isoformat() + "Z"
+
     tw_accounts = wise_retrieve_accounts(profile_id)
     for tw_account in tw_accounts:
-        interval_end = datetime.utcnow()
-        interval_start = interval_end - timedelta(days=120)
         statement = wise.borderless_accounts.statement(
             profile_id,
             tw_account.borderless_account_id,
             tw_account.currency,
-            interval_start.isoformat() + "Z",
-            interval_end.isoformat() + "Z",
+            interval_start_iso,
+            interval_end_iso,
         )
 
         bank_account = (
@@ -1,4 +1,5 @@
 import requests
+from requests.adapters import HTTPAdapter
 from flask import (
     render_template,
     redirect,
@@ -71,8 +72,16 @@ class RefundRequestForm(Form):
             raise ValidationError("Please choose some tickets to refund")
 
 
+# Reuse keep-alive connections to the Wise API, as validating a set of bank
+# details makes several calls and each fresh connection pays for a TLS handshake
+_wise_session = requests.Session()
+_wise_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+_WISE_VALIDATOR_URL = "https://api.transferwise.com/v1/validators/"
+
+
 def wise_validate(endpoint, **args):
-    res = requests.get(f"https://api.transferwise.com/v1/validators/{endpoint}", args)
+    res = _wise_session.get(_WISE_VALIDATOR_URL + endpoint, params=args)
     data = res.json()
     if data.get("validation") != "success":
         app.logger.info(f"Bank validation for {endpoint} failed: {repr(data)}")
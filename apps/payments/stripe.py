@@ -170,10 +170,15 @@ def stripe_waiting(payment_id):
 
 @payments.route("/stripe-webhook", methods=["POST"])
 def stripe_webhook():
+    signature = request.headers.get("STRIPE_SIGNATURE")
+    if signature is None:
+        logger.warning("Missing STRIPE_SIGNATURE header in Stripe webhook")
+        abort(400)
+
     try:
         event = stripe.Webhook.construct_event(
             request.data,
-            request.headers["STRIPE_SIGNATURE"],
+            signature,
             app.config.get("STRIPE_WEBHOOK_KEY"),
         )
     except ValueError:
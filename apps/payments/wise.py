@@ -1,7 +1,9 @@
 import logging
+import threading
 
 from datetime import datetime, timedelta
 from flask import abort, current_app as app, request
+from sqlalchemy import tuple_
 from pywisetransfer.exceptions import InvalidWebhookSignature
 from pywisetransfer.webhooks import validate_request
 
@@ -26,11 +28,12 @@ def webhook(type=None):
 
 @payments.route("/wise-webhook", methods=["POST"])
 def wise_webhook():
-    logger.debug(
-        "Received Wise webhook request: data=%r headers=%r",
-        request.data,
-        request.headers,
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Received Wise webhook request: data=%r headers=%r",
+            request.data,
+            request.headers,
+        )
 
     environment = app.config["TRANSFERWISE_ENVIRONMENT"]
     try:
@@ -42,21 +45,22 @@ def wise_webhook():
         logger.info(e)
         abort(400)
 
-    schema_version = request.json.get("schema_version")
+    # Only parse the body once the signature has been validated
+    event = request.json
+    schema_version = event.get("schema_version")
     if schema_version != "2.0.0":
         logger.warning("Unsupported Wise schema version %s", schema_version)
         abort(500)
 
-    event_type = request.json.get("event_type")
-    try:
-        handler = webhook_handlers[event_type]
-    except KeyError:
+    event_type = event.get("event_type")
+    handler = webhook_handlers.get(event_type)
+    if handler is None:
         logger.warning("Unhandled Wise webhook event type %s", event_type)
         # logger.info("Webhook data: %s", request.data)
         abort(500)
 
     try:
-        return handler(event_type, request.json)
+        return handler(event_type, event)
     except Exception:
         logger.exception("Unhandled exception during Wise webhook")
         # logger.info("Webhook data: %s", request.data)
@@ -102,11 +106,24 @@ def wise_balance_credit(event_type, event):
         logger.warning("Could not find bank account")
         return ("", 204)
 
-    try:
-        sync_wise_statement(profile_id, borderless_account_id, currency)
-    except Exception:
-        logger.exception("Error fetching statement")
-        return ("", 500)
+    # Fetch and import the statement off the request thread - it makes two
+    # Wise API calls, so doing it inline holds the webhook open for seconds.
+    # Concurrent deliveries serialise on the account row lock taken in
+    # sync_wise_statement, with duplicates caught by the dedupe check.
+    flask_app = app._get_current_object()
+
+    def sync():
+        with flask_app.app_context():
+            try:
+                sync_wise_statement(profile_id, borderless_account_id, currency)
+            except Exception:
+                logger.exception("Error fetching statement")
+
+    threading.Thread(
+        target=sync,
+        name=f"wise-sync-{borderless_account_id}-{currency}",
+        daemon=True,
+    ).start()
 
     return ("", 204)
 
@@ -123,7 +140,11 @@ def sync_wise_statement(profile_id, borderless_account_id, currency):
         interval_end.isoformat() + "Z",
     )
 
-    # Lock the bank account as BankTransactions don't have an external unique ID
+    # Lock the bank account as BankTransactions don't have an external unique ID.
+    # Concurrent syncs serialise here: a waiter re-imports its own statement
+    # once the winner commits, as it may contain credits the winner's fetch
+    # predates. The statement was fetched above, so the lock only covers the
+    # DB phase.
     # TODO: we could include referenceNumber to prevent this or at least detect issues
     bank_account = (
         BankAccount.query.with_for_update()
@@ -131,8 +152,16 @@ def sync_wise_statement(profile_id, borderless_account_id, currency):
             borderless_account_id=borderless_account_id,
             currency=currency,
         )
-        .one()
+        .first()
     )
+    if bank_account is None:
+        logger.info(
+            "BankAccount for borderless account %s and %s is missing, skipping",
+            borderless_account_id,
+            currency,
+        )
+        db.session.commit()
+        return
     if not bank_account.active:
         logger.info(
             f"BankAccount for borderless account {borderless_account_id} and {currency} is not active, not syncing"
@@ -140,42 +169,77 @@ def sync_wise_statement(profile_id, borderless_account_id, currency):
         db.session.commit()
         return
 
-    # Retrieve or construct transactions for each credit in the statement
-    txns = []
+    # Fetch the transactions already imported for this period in one query,
+    # rather than issuing a SELECT per statement row below
+    existing = {
+        (row.posted, row.type, row.payee)
+        for row in db.session.query(
+            BankTransaction.posted, BankTransaction.type, BankTransaction.payee
+        ).filter(
+            BankTransaction.account_id == bank_account.id,
+            BankTransaction.posted >= interval_start,
+        )
+    }
+
+    # Collect rows for each credit in the statement that isn't already imported
+    rows = []
     for transaction in statement.transactions:
         if transaction.type != "CREDIT":
             continue
 
-        if transaction.details.type != "DEPOSIT":
+        # Munch attribute access is a dict lookup each time, so pull the
+        # fields we use repeatedly into locals
+        details = transaction.details
+        if details.type != "DEPOSIT":
             continue
 
-        # Attempt to find transaction in the application database
+        txn_type = details.type.lower()
+        payee = details.paymentReference
+
+        # The statement dates are ISO strings, while posted comes back from
+        # the database as a datetime, so normalise before comparing
+        posted = datetime.fromisoformat(transaction.date).replace(tzinfo=None)
+
         # TODO: we should probably check the amount_int, too
-        txn = BankTransaction.query.filter_by(
-            account_id=bank_account.id,
-            posted=transaction.date,
-            type=transaction.details.type.lower(),
-            payee=transaction.details.paymentReference,
-        ).first()
-
-        # Construct a transaction record if not found
-        if txn:
+        key = (posted, txn_type, payee)
+        if key in existing:
             continue
-
-        txn = BankTransaction(
-            account_id=bank_account.id,
-            posted=transaction.date,
-            type=transaction.details.type.lower(),
-            amount=transaction.amount.value,
-            payee=transaction.details.paymentReference,
-            wise_id=transaction.referenceNumber,
+        existing.add(key)
+
+        rows.append(
+            dict(
+                account_id=bank_account.id,
+                posted=posted,
+                type=txn_type,
+                amount_int=int(transaction.amount.value * 100),
+                payee=payee,
+                wise_id=transaction.referenceNumber,
+            )
         )
-        db.session.add(txn)
-        txns.append(txn)
 
-    logger.info("Imported %s transactions", len(txns))
+    # Insert the new transactions in a single statement rather than one per row
+    if rows:
+        db.session.execute(BankTransaction.__table__.insert(), rows)
+
+    logger.info("Imported %s transactions", len(rows))
     db.session.commit()
 
+    # The insert above bypasses the ORM, so fetch the new rows for
+    # reconciliation. Select by the same (posted, type, payee) key the dedupe
+    # uses: wise_ids aren't trusted to be unique and may be missing entirely,
+    # and constrain to unreconciled rows in this statement window to avoid
+    # picking up an older transaction with the same payee.
+    txns = []
+    if rows:
+        txns = BankTransaction.query.filter(
+            BankTransaction.account_id == bank_account.id,
+            BankTransaction.posted >= interval_start,
+            BankTransaction.payment_id.is_(None),
+            tuple_(
+                BankTransaction.posted, BankTransaction.type, BankTransaction.payee
+            ).in_([(row["posted"], row["type"], row["payee"]) for row in rows]),
+        ).all()
+
     logger.info("Reconciling...")
     reconcile_txns(txns, doit=True)
 
@@ -200,6 +264,10 @@ def wise_business_profile():
     return id
 
 
+# Built once: strips the separators Wise puts in sort codes and IBANs
+_BANK_DETAIL_SEPARATORS = str.maketrans("", "", " -")
+
+
 def _collect_bank_accounts(borderless_account):
     # Wise creates the concept of a multi-currency account by calling normal
     # bank accounts "balances", and collecting them into a "borderless account",
@@ -214,21 +282,20 @@ def _collect_bank_accounts(borderless_account):
         except AttributeError:
             continue
 
-        address = ", ".join(
-            [
-                account.bankDetails.bankAddress.addressFirstLine,
-                account.bankDetails.bankAddress.city
-                + " "
-                + (account.bankDetails.bankAddress.postCode or ""),
-                account.bankDetails.bankAddress.country,
-            ]
+        bank_address = account.bankDetails.bankAddress
+        address = (
+            f"{bank_address.addressFirstLine}, "
+            f"{bank_address.city} {bank_address.postCode or ''}, "
+            f"{bank_address.country}"
         )
 
         sort_code = account_number = None
 
         if account.bankDetails.currency == "GBP":
             # bankCode is the SWIFT code for non-GBP accounts.
-            sort_code = account.bankDetails.bankCode.replace("-", "")
+            sort_code = account.bankDetails.bankCode.translate(
+                _BANK_DETAIL_SEPARATORS
+            )
 
             if len(account.bankDetails.accountNumber) == 8:
                 account_number = account.bankDetails.accountNumber
@@ -236,7 +303,9 @@ def _collect_bank_accounts(borderless_account):
                 # Wise bug:
                 # accountNumber is sometimes erroneously the IBAN for GBP accounts.
                 # Extract the account number from the IBAN.
-                account_number = account.bankDetails.accountNumber.replace(" ", "")[-8:]
+                account_number = account.bankDetails.accountNumber.translate(
+                    _BANK_DETAIL_SEPARATORS
+                )[-8:]
 
         yield BankAccount(
             sort_code=sort_code,
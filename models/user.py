@@ -1,5 +1,10 @@
 from __future__ import annotations
-import base64
+
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib codec, if available
+    import pybase64 as base64
+except ImportError:
+    import base64
 import hmac
 import hashlib
 import random